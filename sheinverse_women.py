@@ -2,6 +2,7 @@ import time
 import json
 import re
 import requests
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
@@ -20,6 +21,12 @@ EXCLUDE_KEYWORDS: List[str] = []    # e.g. ["kids", "pet"]
 MIN_PRICE: Optional[float] = None   # e.g. 500.0
 MAX_PRICE: Optional[float] = None   # e.g. 1500.0
 
+# ---- Alert suppression ----
+ALERT_COOLDOWN_SEC = 3600               # Ignore repeat alerts for the same product within 1 hour
+ALERT_CACHE_MAX_ENTRIES = 5000          # Oldest entries are evicted beyond this size
+MIN_DROP_PCT: Optional[float] = None    # e.g. 5.0  (only howl for drops of at least 5%)
+MIN_DROP_AMOUNT: Optional[float] = None # e.g. 100.0
+
 # =========================================
 
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
@@ -52,6 +59,89 @@ def broadcast_to_subscribers(text: str, subscribers: List[int]) -> None:
         send_telegram_message(text, chat_id)
 
 
+# ---------- Alert suppression ----------
+
+class AlertSuppressionCache:
+    """
+    Per-product, per-event-type memory of recent alerts.
+    - entries expire after `ttl_sec`; the least recently used are evicted past `max_entries`
+    - within the cooldown, an alert is only allowed if the price went lower than
+      the last alerted price (so flapping / stale prices don't howl twice)
+    """
+
+    def __init__(
+        self,
+        ttl_sec: float = ALERT_COOLDOWN_SEC,
+        max_entries: int = ALERT_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.suppressed = 0
+        # (product_key, event_type) -> (alert_time, alerted_price)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Optional[float]]]" = OrderedDict()
+
+    def should_alert(
+        self,
+        product_key: str,
+        event_type: str,
+        now: float,
+        price: Optional[float] = None,
+    ) -> bool:
+        """Return True if the alert should be sent (and remember it), False if suppressed."""
+        key = (product_key, event_type)
+        entry = self._entries.get(key)
+        if entry is not None:
+            alert_time, alerted_price = entry
+            if now - alert_time < self.ttl_sec:
+                if price is None or alerted_price is None or price >= alerted_price:
+                    # Same or oscillating event inside the cooldown window
+                    self._entries.move_to_end(key)
+                    self.suppressed += 1
+                    return False
+            else:
+                del self._entries[key]
+
+        self._entries[key] = (now, price)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def active_price(self, product_key: str, event_type: str, now: float) -> Optional[float]:
+        """Return the last alerted price if its cooldown is still running, else None."""
+        entry = self._entries.get((product_key, event_type))
+        if entry is None or now - entry[0] >= self.ttl_sec:
+            return None
+        return entry[1]
+
+    def to_state(self, now: float) -> List[List]:
+        """Serialize unexpired entries (oldest first) for the JSON state file."""
+        return [
+            [product_key, event_type, alert_time, alerted_price]
+            for (product_key, event_type), (alert_time, alerted_price) in self._entries.items()
+            if now - alert_time < self.ttl_sec
+        ]
+
+    def load_state(self, entries: List[List]) -> None:
+        """Restore entries saved by `to_state`, skipping malformed ones."""
+        if not isinstance(entries, list):
+            return
+        for entry in entries:
+            try:
+                product_key, event_type, alert_time, alerted_price = entry
+                alert_time = float(alert_time)
+                if alerted_price is not None:
+                    alerted_price = float(alerted_price)
+            except (TypeError, ValueError):
+                continue
+            self._entries[(str(product_key), str(event_type))] = (alert_time, alerted_price)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 # ---------- State ----------
 
 def load_state() -> Dict:
@@ -68,6 +158,9 @@ def load_state() -> Dict:
     state.setdefault("total_new_detected", 0)   # all new products seen
     state.setdefault("total_new_alerted", 0)    # new products that triggered alerts
     state.setdefault("last_update_id", 0)       # for Telegram commands
+    state.setdefault("total_alerts_suppressed", 0)  # duplicate / flapping alerts not broadcast
+    state.setdefault("total_drops_below_min", 0)    # drops smaller than MIN_DROP_PCT / MIN_DROP_AMOUNT
+    state.setdefault("alert_cache", [])         # recent price-drop alerts (cooldown)
     state.setdefault("subscribers", [])         # all chat_ids that joined the pack
 
     # ensure subscribers are ints
@@ -182,6 +275,27 @@ def product_matches_filters(prod: Dict, numeric_price: Optional[float]) -> bool:
     return True
 
 
+def drop_meets_threshold(reference_price: Optional[float], new_price: Optional[float]) -> bool:
+    """
+    Check if a price drop is big enough to howl about.
+    The drop is measured from `reference_price` (the highest price since the
+    last alert), not from the previous scan, so many small drops still add up.
+    """
+    if reference_price is None or new_price is None or new_price >= reference_price:
+        return False
+
+    drop_amount = reference_price - new_price
+    drop_pct = (drop_amount / reference_price * 100) if reference_price else 0.0
+
+    if MIN_DROP_AMOUNT is not None and drop_amount < MIN_DROP_AMOUNT:
+        return False
+
+    if MIN_DROP_PCT is not None and drop_pct < MIN_DROP_PCT:
+        return False
+
+    return True
+
+
 # ---------- Stock handling ----------
 
 def extract_stock_status(prod: Dict) -> Tuple[str, Optional[bool]]:
@@ -337,6 +451,8 @@ def build_status_message(state: Dict, total_results: int, subscriber_count: int)
     total_seen = len(state.get("seen_products", {}))
     total_new_detected = state.get("total_new_detected", 0)
     total_new_alerted = state.get("total_new_alerted", 0)
+    total_alerts_suppressed = state.get("total_alerts_suppressed", 0)
+    total_drops_below_min = state.get("total_drops_below_min", 0)
 
     last_summary_ts = state.get("last_summary_time", 0)
     last_summary_str = (
@@ -354,6 +470,10 @@ def build_status_message(state: Dict, total_results: int, subscriber_count: int)
         filters_parts.append(f"min price: {MIN_PRICE}")
     if MAX_PRICE is not None:
         filters_parts.append(f"max price: {MAX_PRICE}")
+    if MIN_DROP_PCT is not None:
+        filters_parts.append(f"min drop: {MIN_DROP_PCT}%")
+    if MIN_DROP_AMOUNT is not None:
+        filters_parts.append(f"min drop amount: {MIN_DROP_AMOUNT}")
     filters_text = "; ".join(filters_parts) if filters_parts else "none"
 
     msg = (
@@ -363,6 +483,8 @@ def build_status_message(state: Dict, total_results: int, subscriber_count: int)
         f"👁 <b>Distinct prey seen (all time):</b> {total_seen}\n"
         f"🆕 <b>New prey seen (all time):</b> {total_new_detected}\n"
         f"📣 <b>Howls sent (alerts, all time):</b> {total_new_alerted}\n"
+        f"🤫 <b>Howls held back (repeats, all time):</b> {total_alerts_suppressed}\n"
+        f"🪶 <b>Small drops ignored (below min drop, all time):</b> {total_drops_below_min}\n"
         f"🐾 <b>Wolves in pack (subscribers):</b> {subscriber_count}\n"
         f"📊 <b>Last territory report:</b> {last_summary_str}\n\n"
         f"🔍 <b>Hunt filters:</b> {filters_text}"
@@ -515,6 +637,65 @@ def handle_telegram_commands(
     return last_update_id, subscribers
 
 
+# ---------- Price drop decision ----------
+
+def evaluate_price_drop(
+    key: str,
+    stored: Dict,
+    prod: Dict,
+    numeric_price: Optional[float],
+    price_str: str,
+    now: float,
+    alert_cache: AlertSuppressionCache,
+) -> Tuple[str, Optional[str]]:
+    """
+    Decide whether an existing product's new price should howl.
+    Updates the product's drop reference price in `stored` (but not last_price).
+    Returns (outcome, message) where outcome is one of:
+    "alert", "held_back" (cooldown repeat), "below_min" (drop too small) or "" (no drop).
+    """
+    old_price = stored.get("last_price")
+    # Drops are measured from the highest price since the last alert
+    ref_price = stored.get("drop_ref_price", old_price)
+    ref_price_str = stored.get("drop_ref_price_str", stored.get("last_price_str", ""))
+    # While the cooldown runs, subscribers last heard this price
+    alerted_price = alert_cache.active_price(key, "price_drop", now)
+
+    outcome = ""
+    msg = None
+    if numeric_price is not None and old_price is not None and numeric_price < old_price:
+        if product_matches_filters(prod, numeric_price):
+            # Back to (or above) a price subscribers already heard about: a repeat, not a small drop
+            repeat = alerted_price is not None and numeric_price >= alerted_price
+            if not repeat and not drop_meets_threshold(ref_price, numeric_price):
+                outcome = "below_min"
+            elif alert_cache.should_alert(key, "price_drop", now, price=numeric_price):
+                drop_amount = ref_price - numeric_price
+                drop_pct = (drop_amount / ref_price * 100) if ref_price else 0.0
+                msg = price_drop_message(
+                    prod,
+                    old_price_str=ref_price_str,
+                    new_price_str=price_str,
+                    drop_amount=drop_amount,
+                    drop_pct=drop_pct,
+                )
+                outcome = "alert"
+                ref_price, ref_price_str = numeric_price, price_str
+                alerted_price = numeric_price
+            else:
+                outcome = "held_back"
+
+    # Price rises lift the reference, but never above the last alerted
+    # price while its cooldown runs (so flaps can't fake a big drop)
+    if numeric_price is not None and (ref_price is None or numeric_price > ref_price):
+        if alerted_price is None or ref_price is None:
+            ref_price, ref_price_str = numeric_price, price_str
+
+    stored["drop_ref_price"] = ref_price
+    stored["drop_ref_price_str"] = ref_price_str
+    return outcome, msg
+
+
 # ---------- Main loop ----------
 
 def main_loop():
@@ -526,6 +707,10 @@ def main_loop():
     total_new_alerted = state.get("total_new_alerted", 0)
     last_update_id = state.get("last_update_id", 0)
     subscribers: List[int] = state.get("subscribers", [])
+    alert_cache = AlertSuppressionCache()
+    alert_cache.load_state(state.get("alert_cache", []))
+    total_alerts_suppressed = state.get("total_alerts_suppressed", 0)
+    total_drops_below_min = state.get("total_drops_below_min", 0)
 
     startup_msg = (
         "🐺 <b>WOLF ENGINE HOWLING ONLINE</b>\n\n"
@@ -551,6 +736,8 @@ def main_loop():
 
         current_codes = set()
         new_products_found: List[Dict] = []
+        suppressed_before = alert_cache.suppressed
+        drops_below_min_this_run = 0
 
         for prod in products:
             key = extract_product_key(prod)
@@ -569,6 +756,8 @@ def main_loop():
                     "name": prod.get("name", "Unknown"),
                     "last_price": numeric_price,
                     "last_price_str": price_str,
+                    "drop_ref_price": numeric_price,
+                    "drop_ref_price_str": price_str,
                     "url": link,
                     "last_stock_label": stock_label,
                     "in_stock": in_stock,
@@ -578,22 +767,16 @@ def main_loop():
             else:
                 # Existing product: check price change
                 stored = seen_products[key]
-                old_price = stored.get("last_price")
-                old_price_str = stored.get("last_price_str", "")
-
-                if numeric_price is not None and old_price is not None and numeric_price < old_price:
-                    if product_matches_filters(prod, numeric_price):
-                        drop_amount = old_price - numeric_price
-                        drop_pct = (drop_amount / old_price * 100) if old_price else 0.0
-                        msg = price_drop_message(
-                            prod,
-                            old_price_str=old_price_str,
-                            new_price_str=price_str,
-                            drop_amount=drop_amount,
-                            drop_pct=drop_pct,
-                        )
-                        broadcast_to_subscribers(msg, subscribers)
-                        print(f"📉 Price drop howl sent: {prod.get('name', 'Unknown')}")
+                outcome, msg = evaluate_price_drop(
+                    key, stored, prod, numeric_price, price_str, now, alert_cache
+                )
+                if outcome == "alert":
+                    broadcast_to_subscribers(msg, subscribers)
+                    print(f"📉 Price drop howl sent: {prod.get('name', 'Unknown')}")
+                elif outcome == "held_back":
+                    print(f"🤫 Price drop howl held back: {prod.get('name', 'Unknown')}")
+                elif outcome == "below_min":
+                    drops_below_min_this_run += 1
 
                 # Update stored price and stock info
                 stored["last_price"] = numeric_price
@@ -616,6 +799,12 @@ def main_loop():
             total_new_alerted += 1
             print(f"✅ New prey howl sent: {prod.get('name', 'Unknown')}")
 
+        suppressed_this_run = alert_cache.suppressed - suppressed_before
+        total_alerts_suppressed += suppressed_this_run
+        total_drops_below_min += drops_below_min_this_run
+        state["total_alerts_suppressed"] = total_alerts_suppressed
+        state["total_drops_below_min"] = total_drops_below_min
+
         # Handle Telegram commands (multi-user)
         last_update_id, subscribers = handle_telegram_commands(
             last_update_id=last_update_id,
@@ -630,7 +819,9 @@ def main_loop():
             summary = get_categorical_summary(products)
             summary += (
                 f"\n\n🆕 <b>New prey seen (all time):</b> {total_new_detected}\n"
-                f"📣 <b>Howls sent (all time):</b> {total_new_alerted}"
+                f"📣 <b>Howls sent (all time):</b> {total_new_alerted}\n"
+                f"🤫 <b>Howls held back (repeats, all time):</b> {total_alerts_suppressed}\n"
+                f"🪶 <b>Small drops ignored (all time):</b> {total_drops_below_min}"
             )
             broadcast_to_subscribers(summary, subscribers)
             last_summary_time = now
@@ -644,11 +835,14 @@ def main_loop():
         state["total_new_alerted"] = total_new_alerted
         state["last_update_id"] = last_update_id
         state["subscribers"] = subscribers
+        state["alert_cache"] = alert_cache.to_state(now)
         save_state(state)
 
         print(
             f"💾 State saved | Total prey: {len(current_codes)} | "
             f"New this run: {len(new_products_found)} | Howls this run: {len(alert_products)} | "
+            f"Held back this run: {suppressed_this_run} | "
+            f"Small drops this run: {drops_below_min_this_run} | "
             f"Pack size: {len(subscribers)}"
         )
 
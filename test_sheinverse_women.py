@@ -0,0 +1,175 @@
+import sheinverse_women as sw
+
+
+# ---------- AlertSuppressionCache ----------
+
+def test_repeat_alert_inside_ttl_is_suppressed():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    assert cache.should_alert("p1", "price_drop", 0, price=900.0)
+    assert not cache.should_alert("p1", "price_drop", 10, price=900.0)
+    assert not cache.should_alert("p1", "price_drop", 20, price=950.0)
+    assert cache.suppressed == 2
+
+
+def test_lower_price_inside_ttl_is_allowed():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    assert cache.should_alert("p1", "price_drop", 0, price=900.0)
+    assert cache.should_alert("p1", "price_drop", 10, price=800.0)
+    # 850 is above the last alerted price (800), so it is a flap
+    assert not cache.should_alert("p1", "price_drop", 20, price=850.0)
+    assert cache.suppressed == 1
+
+
+def test_entry_expires_after_ttl():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    assert cache.should_alert("p1", "price_drop", 0, price=900.0)
+    assert not cache.should_alert("p1", "price_drop", 99, price=900.0)
+    assert cache.should_alert("p1", "price_drop", 100, price=900.0)
+
+
+def test_products_and_event_types_are_independent():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    assert cache.should_alert("p1", "price_drop", 0, price=900.0)
+    assert cache.should_alert("p2", "price_drop", 0, price=900.0)
+    assert cache.should_alert("p1", "back_in_stock", 0)
+
+
+def test_lru_eviction():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=2)
+    cache.should_alert("p1", "price_drop", 0, price=900.0)
+    cache.should_alert("p2", "price_drop", 1, price=900.0)
+    # touching p1 makes p2 the least recently used
+    assert not cache.should_alert("p1", "price_drop", 2, price=900.0)
+    cache.should_alert("p3", "price_drop", 3, price=900.0)
+    assert len(cache) == 2
+
+    assert not cache.should_alert("p1", "price_drop", 4, price=900.0)
+    assert cache.should_alert("p2", "price_drop", 5, price=900.0)
+
+
+def test_state_round_trip_keeps_cooldown_and_drops_expired():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    cache.should_alert("p1", "price_drop", 0, price=900.0)
+    cache.should_alert("p2", "price_drop", 80, price=500.0)
+
+    saved = cache.to_state(now=150)
+    assert saved == [["p2", "price_drop", 80, 500.0]]
+
+    restored = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    restored.load_state(saved)
+    assert not restored.should_alert("p2", "price_drop", 150, price=500.0)
+    assert restored.should_alert("p1", "price_drop", 150, price=900.0)
+
+
+# ---------- drop_meets_threshold ----------
+
+def test_drop_threshold_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", None)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    assert sw.drop_meets_threshold(1000.0, 999.0)
+    assert not sw.drop_meets_threshold(1000.0, 1000.0)
+    assert not sw.drop_meets_threshold(None, 900.0)
+
+
+def test_drop_threshold_pct_and_amount(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", 5.0)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    assert not sw.drop_meets_threshold(1000.0, 980.0)
+    assert sw.drop_meets_threshold(1000.0, 950.0)
+
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", None)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", 100.0)
+    assert not sw.drop_meets_threshold(1000.0, 950.0)
+    assert sw.drop_meets_threshold(1000.0, 900.0)
+
+
+def test_small_drops_add_up_against_reference_price(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", 5.0)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    reference = 1000.0
+    price = reference
+    alerts = 0
+    for _ in range(10):
+        price *= 0.98
+        if sw.drop_meets_threshold(reference, price):
+            alerts += 1
+            reference = price
+    assert alerts == 3
+
+
+def test_load_state_skips_malformed_entries():
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    cache.load_state([
+        ["p1", "price_drop", 0, 900.0],
+        ["p2", "price_drop"],
+        ["p3", "price_drop", "soon", 900.0],
+        None,
+        ["p4", "price_drop", 0, None],
+    ])
+    assert len(cache) == 2
+    assert cache.active_price("p1", "price_drop", 10) == 900.0
+
+    empty = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+    empty.load_state({"not": "a list"})
+    assert len(empty) == 0
+
+
+# ---------- evaluate_price_drop ----------
+
+def _scan(prices, cache, step=10):
+    """Feed a product's prices through evaluate_price_drop like main_loop does."""
+    prod = {"code": "p1", "name": "Hoodie"}
+    stored = {"last_price": prices[0], "last_price_str": f"Rs{prices[0]}",
+              "drop_ref_price": prices[0], "drop_ref_price_str": f"Rs{prices[0]}"}
+    results = []
+    for i, price in enumerate(prices[1:], start=1):
+        price_str = f"Rs{price}"
+        results.append(sw.evaluate_price_drop("p1", stored, prod, price, price_str, i * step, cache))
+        stored["last_price"] = price
+        stored["last_price_str"] = price_str
+    return results, stored
+
+
+def test_flap_inside_cooldown_does_not_fake_a_big_drop(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", 5.0)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+
+    results, stored = _scan([1000, 900, 1000, 899], cache)
+    outcomes = [outcome for outcome, _ in results]
+    assert outcomes == ["alert", "", "below_min"]
+    assert "Old Price:</b> Rs1000" in results[0][1]
+    assert stored["drop_ref_price"] == 900
+
+
+def test_flap_message_is_measured_from_last_alerted_price(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", 5.0)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+
+    results, _ = _scan([1000, 900, 1000, 850], cache)
+    outcome, msg = results[-1]
+    assert outcome == "alert"
+    assert "Old Price:</b> Rs900" in msg
+    assert "Drop:</b> 50.00 (5.6%)" in msg
+
+
+def test_same_price_repeat_is_held_back_without_threshold(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", None)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+
+    results, _ = _scan([1000, 900, 1000, 900], cache)
+    assert [outcome for outcome, _ in results] == ["alert", "", "held_back"]
+    assert cache.suppressed == 1
+
+
+def test_reference_rises_again_after_cooldown(monkeypatch):
+    monkeypatch.setattr(sw, "MIN_DROP_PCT", 5.0)
+    monkeypatch.setattr(sw, "MIN_DROP_AMOUNT", None)
+    cache = sw.AlertSuppressionCache(ttl_sec=100, max_entries=10)
+
+    # Scans 60s apart: 950 at t=120 is inside the t=60 cooldown, 1000 at t=180 is not
+    results, stored = _scan([1000, 900, 950, 1000, 900], cache, step=60)
+    assert [outcome for outcome, _ in results] == ["alert", "", "", "alert"]
+    assert "Old Price:</b> Rs1000" in results[-1][1]